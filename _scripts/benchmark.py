@@ -0,0 +1,441 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime as dt
+
+
+# CONFIG
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_SIZES = "1000,10000,100000"
+SUITES = ["scan", "review", "embed", "query", "queue"]
+
+# Share of the vault taken by each kind of note. Atoms live in the vault root.
+LAYOUT = {
+    "atom": 0.50,
+    "molecule": 0.20,
+    "source": 0.15,
+    "topic": 0.10,
+    "author": 0.05,
+}
+FOLDERS = {
+    "atom": "",
+    "molecule": "Molecules",
+    "source": "Sources",
+    "topic": "Topics",
+    "author": "Authors",
+}
+TODO_RATE = 0.02
+WORDS = (
+    "market incumbent disruption scale margin leverage signal noise regression "
+    "variance estimator portfolio entropy protein enzyme memory recall habit "
+    "incentive moat network feedback compounding capital risk model theory"
+).split()
+
+# Make the scripts in _scripts/ importable regardless of where we are called from
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+###################
+# VAULT GENERATOR #
+###################
+
+
+def note_titles(n_notes: int) -> dict[str, list[str]]:
+    # Split n_notes across the note types according to LAYOUT. Every type gets
+    # at least one note, so n_notes must be at least len(LAYOUT).
+    counts = {kind: max(1, int(n_notes * share)) for kind, share in LAYOUT.items()}
+    counts["atom"] += n_notes - sum(counts.values())
+    titles = {
+        "atom": [f"Atom {i:06d}" for i in range(counts["atom"])],
+        "molecule": [f"Molecule {i:06d}" for i in range(counts["molecule"])],
+        "topic": [f"Topic {i:06d}" for i in range(counts["topic"])],
+        "author": [f"Author {i:06d}" for i in range(counts["author"])],
+    }
+    titles["source"] = [
+        f"Source {i:06d}, {titles['author'][i % counts['author']].split()[-1]}"
+        for i in range(counts["source"])
+    ]
+    return titles
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method, fine for the small means used for link counts.
+    limit = math.exp(-mean)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def paragraph(rng: random.Random, n_words: int, links: list[str]) -> str:
+    # Random prose with the given [[links]] scattered through it.
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    for link in links:
+        words.insert(rng.randrange(len(words) + 1), f"[[{link}]]")
+    return " ".join(words)
+
+
+def note_contents(
+    kind: str,
+    rng: random.Random,
+    titles: dict[str, list[str]],
+    link_density: float,
+    sections: int,
+    words: int,
+) -> str:
+    # Build the markdown for one note, following the layout of _templates/.
+    linkable = titles["atom"] + titles["molecule"]
+    n_links = poisson(rng, link_density)
+    links = [rng.choice(linkable) for _ in range(n_links)]
+    topics = " ".join(f"[[{t}]]" for t in rng.sample(titles["topic"], 1))
+    todo = " #todo" if rng.random() < TODO_RATE else ""
+
+    if kind in ("atom", "molecule"):
+        reference = rng.choice(titles["source"])
+        return (
+            f"{paragraph(rng, words, links)}\n\n"
+            f"---\n"
+            f"Topics: {topics}\n"
+            f"Reference: [[{reference}]]\n"
+            f"Type: #{kind}{todo}\n"
+        )
+    if kind == "source":
+        author = rng.choice(titles["author"])
+        body = "\n\n".join(
+            f"## Theme {i + 1}\n\n- {paragraph(rng, words, links[i::sections])}"
+            for i in range(sections)
+        )
+        return (
+            f"Author: [[{author}]]\n"
+            f"Type: #source #book{todo}\n"
+            f"Link: \n"
+            f"Topics: {topics}\n\n"
+            f"---\n\n"
+            f"{body}\n"
+        )
+    return f"Type: #{kind}"
+
+
+def generate_vault(
+    vault_path: str,
+    n_notes: int,
+    link_density: float = 3,
+    sections: int = 4,
+    words: int = 80,
+    seed: int = 0,
+):
+    # Write a synthetic Molecular Notes vault of n_notes notes to vault_path.
+    rng = random.Random(seed)
+    titles = note_titles(n_notes)
+    for folder in FOLDERS.values():
+        os.makedirs(os.path.join(vault_path, folder), exist_ok=True)
+    os.makedirs(os.path.join(vault_path, "_scripts"), exist_ok=True)
+    shutil.copytree(
+        os.path.join(REPO_DIR, "_templates"),
+        os.path.join(vault_path, "_templates"),
+        dirs_exist_ok=True,
+    )
+    for kind, names in titles.items():
+        for name in names:
+            contents = note_contents(kind, rng, titles, link_density, sections, words)
+            with open(os.path.join(vault_path, FOLDERS[kind], f"{name}.md"), "w") as f:
+                f.write(contents)
+
+
+###########
+# HELPERS #
+###########
+
+
+@contextlib.contextmanager
+def in_directory(path: str):
+    # The scripts all assume they are run from the vault root.
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+@contextlib.contextmanager
+def patched(obj, name: str, value):
+    # Temporarily replace obj.name, e.g. to skip sleeps or prompts.
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+
+def timeit(func, repeats: int) -> list[float]:
+    # Run func `repeats` times, returning wall-clock seconds for each run.
+    times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def stub_embedding(dim: int):
+    # Deterministic stand-in for gpt_search.get_embedding that never hits the API.
+    import numpy as np
+
+    def get_embedding(block: str) -> list:
+        rng = np.random.default_rng(zlib.crc32(block.encode()))
+        return rng.standard_normal(dim).tolist()
+
+    return get_embedding
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+##########
+# SUITES #
+##########
+
+
+class SuiteUnavailable(Exception):
+    # Raised when a suite's dependencies are installed but can't be used here.
+    pass
+
+
+def bench_obsidian_util(vault_path: str, suites: list[str], repeats: int) -> dict:
+    import obsidian_util
+
+    # create_topics reads vault_path from the module globals set by __main__
+    obsidian_util.vault_path = vault_path
+
+    def scan():
+        # Same cleanup pass as obsidian_util.__main__
+        for selector, folder in [
+            ("Type: #topic", "Topics"),
+            ("Type: #author", "Authors"),
+            ("Type: #molecule", "Molecules"),
+            ("Type: #source", "Sources"),
+        ]:
+            obsidian_util.move_selector_to_folder(selector, folder, vault_path)
+        obsidian_util.create_authors(vault_path)
+        obsidian_util.create_topics(vault_path)
+
+    def review():
+        obsidian_util.notes_to_review(vault_path)
+
+    funcs = {"scan": scan, "review": review}
+    return {s: timeit(funcs[s], repeats) for s in suites if s in funcs}
+
+
+def bench_gpt_search(vault_path: str, suites: list[str], repeats: int, dim: int) -> dict:
+    import gpt_search
+
+    def embed():
+        gpt_search.build_embeddings()
+
+    def query():
+        gpt_search.query_embeddings("Weaknesses of OLS regression").iloc[:10]
+
+    # tiktoken downloads its encoding on first use, keep that out of the timings
+    try:
+        gpt_search.num_tokens_from_string("")
+    except OSError as e:
+        # requests' ConnectionError is an OSError, as are cache read failures
+        raise SuiteUnavailable(f"could not load tiktoken encoding ({e})")
+
+    # The real build and query paths. Only the API call, its rate-limit sleep and
+    # the cost confirmation prompt are stubbed; token counting is still timed.
+    res = {}
+    with in_directory(vault_path), patched(
+        gpt_search, "get_embedding", stub_embedding(dim)
+    ), patched(gpt_search.time, "sleep", lambda _: None), patched(
+        gpt_search.click, "confirm", lambda *args, **kwargs: True
+    ):
+        if "embed" in suites:
+            res["embed"] = timeit(embed, repeats)
+        if "query" in suites:
+            if not os.path.exists(gpt_search.DF_FILE):
+                embed()
+            res["query"] = timeit(query, repeats)
+    return res
+
+
+def bench_polymer(vault_path: str, suites: list[str], repeats: int) -> dict:
+    if "queue" not in suites:
+        return {}
+
+    # Bare-mode streamlit logs a "missing ScriptRunContext" warning to stderr for
+    # every st.* call. Its handlers bind to sys.stderr on import, so the import
+    # must happen inside the redirect too.
+    with in_directory(vault_path), contextlib.redirect_stderr(io.StringIO()):
+        # polymer builds its UI and db.json at import time, so import from the vault.
+        with contextlib.redirect_stdout(io.StringIO()):
+            polymer = importlib.import_module("polymer")
+        # Make sure db.json exists so we time the steady-state rerun path
+        polymer.write_db(polymer.create_db())
+
+        def queue():
+            db = polymer.create_db()
+            polymer.write_db(db)
+            polymer.list_atoms(db)
+
+        return {"queue": timeit(queue, repeats)}
+
+
+def run_suites(vault_path: str, suites: list[str], repeats: int, dim: int) -> dict:
+    # Run each script's suites, skipping any whose dependencies aren't available.
+    runs = [
+        (["scan", "review"], lambda: bench_obsidian_util(vault_path, suites, repeats)),
+        (["embed", "query"], lambda: bench_gpt_search(vault_path, suites, repeats, dim)),
+        (["queue"], lambda: bench_polymer(vault_path, suites, repeats)),
+    ]
+    res = {}
+    for names, func in runs:
+        if not any(s in suites for s in names):
+            continue
+        try:
+            res.update(func())
+        except (ImportError, SuiteUnavailable) as e:
+            print(f"Skipping {', '.join(names)}: {e}")
+            res.update({s: None for s in names if s in suites})
+    return res
+
+
+def summarise(times: list[float]) -> dict:
+    if times is None:
+        return {"skipped": True}
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "times": times,
+    }
+
+
+def compare(old_file: str, new_file: str):
+    # Print the median time of each (notes, suite) pair relative to an older run.
+    with open(old_file, "r") as f:
+        old = json.load(f)["results"]
+    with open(new_file, "r") as f:
+        new = json.load(f)["results"]
+    print(f"\n{'notes':>8} {'suite':<8} {'old (s)':>10} {'new (s)':>10} {'ratio':>7}")
+    for n_notes, suites in new.items():
+        for suite, stats in suites.items():
+            before = old.get(n_notes, {}).get(suite, {})
+            if "median" not in stats or "median" not in before:
+                continue
+            ratio = stats["median"] / before["median"] if before["median"] else 0
+            print(
+                f"{n_notes:>8} {suite:<8} {before['median']:>10.4f} "
+                f"{stats['median']:>10.4f} {ratio:>6.2f}x"
+            )
+
+
+def bench_size(root: str, n_notes: int, suites: list[str], args) -> dict:
+    # Generate a vault of n_notes under root and run the suites against it.
+    vault_path = os.path.abspath(os.path.join(root, f"vault_{n_notes}"))
+    shutil.rmtree(vault_path, ignore_errors=True)
+
+    print(f"Generating vault with {n_notes} notes...")
+    start = time.perf_counter()
+    generate_vault(vault_path, n_notes, args.links, args.sections, args.words, args.seed)
+    print(f"  generated in {time.perf_counter() - start:.2f}s")
+
+    timings = run_suites(vault_path, suites, args.repeats, args.dim)
+    results = {s: summarise(t) for s, t in timings.items()}
+    for suite, stats in results.items():
+        if "median" in stats:
+            print(f"  {suite:<8} {stats['median']:.4f}s (median of {args.repeats})")
+    return results
+
+
+#######
+# CLI #
+#######
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Molecular Notes scripts on synthetic vaults."
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated note counts.")
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma-separated suites.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per suite.")
+    parser.add_argument("--links", type=float, default=3, help="Mean links per note.")
+    parser.add_argument("--sections", type=int, default=4, help="Sections per source note.")
+    parser.add_argument("--words", type=int, default=80, help="Words per paragraph.")
+    parser.add_argument("--dim", type=int, default=64, help="Stub embedding dimension.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vault-dir", help="Keep generated vaults here instead of a temp dir.")
+    parser.add_argument("--output", help="Results file (default: bench_<timestamp>.json).")
+    parser.add_argument("--compare", help="Previous results file to compare against.")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if min(sizes) < len(LAYOUT):
+        parser.error(f"sizes must be at least {len(LAYOUT)}, one note of each type")
+    suites = [s for s in args.suites.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    output = args.output or f"bench_{dt.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    report = {
+        "meta": {
+            "timestamp": dt.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": {},
+    }
+    for n_notes in sizes:
+        if args.vault_dir:
+            res = bench_size(args.vault_dir, n_notes, suites, args)
+        else:
+            # Removed even if a suite fails or the run is interrupted
+            with tempfile.TemporaryDirectory(prefix="molecular_notes_") as root:
+                res = bench_size(root, n_notes, suites, args)
+
+        # Save after every size so a later failure doesn't lose finished timings
+        report["results"][str(n_notes)] = res
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Saved results to {output}")
+
+    if args.compare:
+        compare(args.compare, output)
+
+
+if __name__ == "__main__":
+    # python _scripts/benchmark.py --sizes 1000,10000
+    # python _scripts/benchmark.py --compare bench_old.json
+    main()